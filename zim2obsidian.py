@@ -1,731 +1,1188 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Zim Wiki to Obsidian Converter
-
-This script converts Zim Wiki notebooks to Obsidian vaults.
-"""
-
-
-
-import os
-import re
-import shutil
-import argparse
-import logging
-import logging.handlers  # Import handlers module
-import datetime
-import yaml
-from pathlib import Path
-import glob
-
-# Setup logging
-def setup_logging(log_level, log_file=None):
-    """
-    Setup logging
-    
-    Args:
-        log_level: The logging level ('debug', 'info', 'warning', 'error', 'critical')
-        log_file: Path to the log file. If None, a default path is used.
-    
-    Returns:
-        A configured logger object
-    """
-    # Map log level strings to logging constants
-    log_levels = {
-        'debug': logging.DEBUG,
-        'info': logging.INFO,
-        'warning': logging.WARNING,
-        'error': logging.ERROR,
-        'critical': logging.CRITICAL
-    }
-    level = log_levels.get(log_level.lower(), logging.INFO)
-    
-    # Create logger
-    logger = logging.getLogger('zim2obsidian')
-    logger.setLevel(level)
-    
-    # Clear existing handlers to avoid duplication
-    if logger.handlers:
-        logger.handlers.clear()
-    
-    # Log format
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler (with rotation)
-    if log_file is None:
-        log_file = "zim2obsidian.log"
-    
-    try:
-        # Use RotatingFileHandler instead of FileHandler to support log rotation
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
-            # mode='a',  # Append mode, do not overwrite existing logs
-            mode='w',  # Overwrite
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=3,  # Keep 3 backup files
-            encoding='utf-8'
-        )
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    except (IOError, PermissionError) as e:
-        # If the log file cannot be created, log an error but do not interrupt the program
-        print(f"Warning: Could not create log file {log_file}: {e}")
-        print(f"Logging will only be output to the console")
-    
-    return logger
-
-class ZimToObsidianConverter:
-    """Converter class for Zim Wiki to Obsidian"""
-    
-    def __init__(self, input_dir, output_dir, logger):
-        """Initialize the converter"""
-        self.input_dir = Path(input_dir)
-        self.output_dir = Path(output_dir)
-        self.logger = logger
-        
-        # Ensure the output directory exists
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Store paths of processed equation files
-        self.processed_equations = set()
-        
-    def convert_notebook(self):
-        """Convert the entire notebook"""
-        self.logger.info(f"Starting conversion: {self.input_dir} -> {self.output_dir}")
-        
-        # Iterate over all Zim Wiki files
-        for zim_file in self.input_dir.glob('**/*.txt'):
-            # Skip non-Zim Wiki files
-            if not self._is_zim_file(zim_file):
-                self.logger.debug(f"Skipping non-Zim file: {zim_file}")
-                continue
-                
-            self.logger.info(f"Processing file: {zim_file}")
-            self.convert_file(zim_file)
-            
-        # Copy attachment files
-        self.copy_attachments()
-        
-        self.logger.info("Conversion complete")
-
-        # Rename Obsidian notes
-        self.rename_obsidian_notes()
-    
-    def _is_zim_file(self, file_path):
-        """Check if a file is a Zim Wiki file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                first_line = f.readline().strip()
-                return first_line.startswith('Content-Type: text/x-zim-wiki')
-        except Exception as e:
-            self.logger.warning(f"Error checking file type: {file_path}, {str(e)}")
-            return False
-    
-    def convert_file(self, zim_file):
-        """Convert a single Zim Wiki file to Obsidian format"""
-        try:
-            # Read Zim file content
-            with open(zim_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Get relative path
-            rel_path = zim_file.relative_to(self.input_dir)
-            
-            # Create the corresponding Obsidian file path
-            obsidian_file = self.output_dir / rel_path.with_suffix('.md')
-            obsidian_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Convert content
-            obsidian_content = self.convert_content(content, zim_file)
-            
-            # Write to Obsidian file
-            with open(obsidian_file, 'w', encoding='utf-8') as f:
-                f.write(obsidian_content)
-                
-            self.logger.debug(f"Converted: {zim_file} -> {obsidian_file}")
-            
-        except Exception as e:
-            self.logger.error(f"Error converting file: {zim_file}, {str(e)}")
-    
-    def convert_content(self, content, file_path):
-        """Convert Zim Wiki content to Obsidian format"""
-        # Extract metadata
-        metadata = self.extract_metadata(content, file_path)
-        
-        # Remove Zim Wiki header
-        content = self.remove_zim_header(content)
-        
-        # Convert various formats
-        content = self.convert_headings(content)
-        content = self.convert_text_formatting(content)
-        content = self.convert_tags(content)
-        content = self.convert_lists(content)
-        content = self.convert_checkboxes(content)
-        content = self.convert_images(content, file_path)
-        content = self.convert_attachments(content, file_path)
-        content = self.convert_code_blocks(content)
-        content = self.convert_equations(content, file_path)
-        content = self.convert_tables(content)
-        content = self.convert_links(content, file_path)
-        
-        # Add Obsidian frontmatter
-        content = self.add_frontmatter(content, metadata)
-        
-        return content
-    
-    def extract_metadata(self, content, file_path):    # Fix: Use file modification time
-        """Extract metadata from Zim Wiki content"""
-        metadata = {}
-        
-        # Extract creation date
-        creation_date_match = re.search(r'Creation-Date: (.+)', content)
-        if creation_date_match:
-            date_str = creation_date_match.group(1).strip()
-            try:
-                # Parse ISO format date
-                dt = datetime.datetime.fromisoformat(date_str)
-                metadata['created'] = dt.strftime('%Y-%m-%dT%H:%M')
-                
-                # Get file modification time
-                mtime = file_path.stat().st_mtime
-                mtime_dt = datetime.datetime.fromtimestamp(mtime)
-                metadata['updated'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
-                
-                self.logger.debug(f"File: {file_path}, Extracted creation time from Creation-Date: {dt}, Modification time: {mtime_dt}")
-            except ValueError:
-                self.logger.warning(f"Could not parse date from Creation-Date: {date_str}")
-
-        # If creation date is not extracted from Creation-Date, try parsing from under H1
-        if 'created' not in metadata:
-            # Remove Zim Wiki header to avoid interfering with H1 title search
-            content_body = self.remove_zim_header(content)
-            h1_match = re.search(r'^====== (.+?) ======$', content_body, re.MULTILINE)
-            if h1_match:
-                h1_end_pos = h1_match.end()
-                # Find the first line after the H1 title
-                next_line_match = re.search(r'^\s*(.+?)\s*$', content_body[h1_end_pos:], re.MULTILINE)
-                if next_line_match:
-                    date_line = next_line_match.group(1).strip()
-                    # Match "Created Tuesday 21 November 2017" format
-                    # Updated regex to be more robust for day and month names
-                    date_pattern_match = re.search(
-                        r'Created\s+(?:.+?)\s+(\d{1,2})\s+(.+?)\s+(\d{4})',
-                        date_line,
-                        re.IGNORECASE
-                    )
-                    if date_pattern_match:
-                        day = int(date_pattern_match.group(1))
-                        month_str = date_pattern_match.group(2)
-                        year = int(date_pattern_match.group(3))
-                        
-                        # Month mapping, can be extended as needed
-                        month_map = {
-                            "一月": 1, "二月": 2, "三月": 3, "四月": 4,
-                            "五月": 5, "六月": 6, "七月": 7, "八月": 8,
-                            "九月": 9, "十月": 10, "十一月": 11, "十二月": 12,
-                            "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4,
-                            "May": 5, "Jun": 6, "Jul": 7, "Aug": 8,
-                            "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
-                        }
-                        
-                        month = None
-                        for k, v in month_map.items():
-                            if k.lower() in month_str.lower():
-                                month = v
-                                break
-                        
-                        if month:
-                            try:
-                                dt = datetime.datetime(year, month, day, 0, 0, 0)
-                                metadata['created'] = dt.strftime('%Y-%m-%dT%H:%M')
-                                self.logger.info(f"File: {file_path}, Extracted creation time from H1: {dt}")
-                                # # If creation date is extracted from H1, ensure updated is also set
-                                # if 'updated' not in metadata:
-                                #     mtime = file_path.stat().st_mtime
-                                #     mtime_dt = datetime.datetime.fromtimestamp(mtime)
-                                #     metadata['updated'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
-                                #     self.logger.debug(f"File: {file_path}, Set modification time (based on H1 creation time): {mtime_dt}")
-                            except ValueError as e:
-                                self.logger.warning(f"Could not construct date from text under H1: {date_line}, Error: {e}")
-                        else:
-                            self.logger.warning(f"Could not parse month from text under H1: {date_line}")
-                    else:
-                        self.logger.debug(f"Line under H1 '{date_line}' does not match expected date format")
-                else:
-                    self.logger.debug(f"No content line after H1 title in file {file_path}")
-            else:
-                self.logger.debug(f"H1 title not found in file {file_path}")
-
-        # If 'updated' time is still missing, use file modification time as a fallback
-        if 'updated' not in metadata:
-            mtime = file_path.stat().st_mtime
-            mtime_dt = datetime.datetime.fromtimestamp(mtime)
-            metadata['updated'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
-            self.logger.debug(f"File: {file_path}, Using file modification time as fallback for updated time: {mtime_dt}")
-            # # If 'created' is also missing, use file modification time as well
-            # if 'created' not in metadata:
-            #     metadata['created'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
-            #     self.logger.debug(f"File: {file_path}, Using file modification time as fallback for created time: {mtime_dt}")
-
-        return metadata
-    
-    def remove_zim_header(self, content):
-        """Remove Zim Wiki header"""
-        # Find content after the first blank line
-        header_end = re.search(r'\n\n', content)
-        if header_end:
-            return content[header_end.end():]
-        return content
-    
-    def convert_headings(self, content):
-        """Convert heading format"""
-        # Replace Zim Wiki heading format with Markdown format
-        content = re.sub(r'====== (.+?) ======', r'# \1', content)
-        content = re.sub(r'===== (.+?) =====', r'## \1', content)
-        content = re.sub(r'==== (.+?) ====', r'### \1', content)
-        content = re.sub(r'=== (.+?) ===', r'#### \1', content)
-        content = re.sub(r'== (.+?) ==', r'##### \1', content)
-        
-        return content
-    
-    def convert_text_formatting(self, content):
-        """Convert text formatting"""
-        # Bold remains unchanged: **text**
-        
-        # Italic: //text// -> *text*
-        content = re.sub(r'//(.+?)//', r'*\1*', content)
-        
-        # Highlight: __text__ -> ==text==
-        content = re.sub(r'__(.+?)__', r'==\1==', content)
-        
-        # Strikethrough remains unchanged: ~~text~~
-        
-        # Code: ''text'' -> `text`
-        content = re.sub(r"''(.+?)''", r'`\1`', content)
-        
-        # Subscript: A_{subscript} -> A<sub>subscript</sub>
-        content = re.sub(r'([A-Za-z0-9])_\{(.+?)\}', r'\1<sub>\2</sub>', content)
-        
-        # Superscript: B^{superscript} -> B<sup>superscript</sup>
-        content = re.sub(r'([A-Za-z0-9])\^\{(.+?)\}', r'\1<sup>\2</sup>', content)
-        
-        return content
-    
-    def convert_tags(self, content):
-        """Convert tag format"""
-        # @tag -> #tag
-        content = re.sub(r'@(\w+)', r'#\1', content)
-        
-        return content
-    
-    def convert_lists(self, content):
-        """Convert list format"""
-        # Unordered list: * item -> - item
-        content = re.sub(r'^\* (.*)$', r'- \1', content, flags=re.MULTILINE)
-        
-        # Ordered list remains unchanged: 1. item
-        
-        return content
-    
-    def convert_checkboxes(self, content):
-        """Convert checkbox format"""
-        # [ ] -> - [ ]
-        content = re.sub(r'^(\s*)?\[ \](.*)$', r'\1- [ ]\2', content, flags=re.MULTILINE)
-        
-        # [*] -> - [x]
-        content = re.sub(r'^(\s*)?\[\*\](.*)$', r'\1- [x]\2', content, flags=re.MULTILINE)
-        
-        # [x] -> - [-]
-        content = re.sub(r'^(\s*)?\[x\](.*)$', r'\1- [-]\2', content, flags=re.MULTILINE)
-        
-        # [>] -> - [>]
-        content = re.sub(r'^(\s*)?\[>\](.*)$', r'\1- [>]\2', content, flags=re.MULTILINE)
-        
-        # [<] -> - [<]
-        content = re.sub(r'^(\s*)?\[<\](.*)$', r'\1- [<]\2', content, flags=re.MULTILINE)
-        
-        return content
-    
-    def convert_images(self, content, file_path):
-        """Convert image references"""
-        # {{./image.png}} -> ![[image.png]]
-        def replace_image(match):
-            img_path_full = match.group(1) # e.g., "./image.png?width=800" or "./image.png"
-
-            # If it's an equation image, skip it (will be handled in convert_equations)
-            if '?type=equation' in img_path_full:
-                return match.group(0)
-
-            img_path_base = img_path_full
-            
-            # Try to extract width parameter
-            # {{.\image.png?width=800}} -> ![[image.png|800]]
-            width_match = re.search(r'width=(\d+)', img_path_full)
-            width_value = None
-            if width_match:
-                width_value = width_match.group(1)
-            
-            # Remove the query parameter part to get the pure image path
-            # {{.\image.png?height=30}} -> ![[image.png]] (height is ignored)
-            if '?' in img_path_base:
-                img_path_base = img_path_base.split('?', 1)[0]
-            
-            # Handle relative paths
-            if img_path_base.startswith('./'):
-                img_path_base = img_path_base[2:]
-            
-            img_name = os.path.basename(img_path_base) # e.g., "image.png"
-
-            if width_value:
-                return f'![[{img_name}|{width_value}]]'
-            else:
-                # Cases with height (ignored) or no parameters
-                return f'![[{img_name}]]'
-            
-        content = re.sub(r'\{\{(.+?)\}\}', replace_image, content)
-        
-        return content
-    
-    def convert_attachments(self, content, file_path):
-        """Convert attachment references"""
-        # [[./file.pdf]] -> ![[file.pdf]]
-        def replace_attachment(match):
-            attachment_path = match.group(1)
-            
-            # Handle relative paths
-            if attachment_path.startswith('./'):
-                attachment_path = attachment_path[2:]
-                
-            # Get attachment filename
-            attachment_name = os.path.basename(attachment_path)
-            
-            return f'![[{attachment_name}]]'
-            
-        content = re.sub(r'\[\[\.\/(.+?)\]\]', replace_attachment, content)
-        
-        return content
-    
-    def convert_code_blocks(self, content):
-        """Convert code blocks"""
-        # {{{code: lang="sh" linenumbers="True" ... }}} -> ```sh ln:true ... ```
-        def replace_code_block(match):
-            code_content = match.group(2)
-            
-            # Extract language and line number settings
-            lang_match = re.search(r'lang="([^"]+)"', match.group(1))
-            lang = lang_match.group(1) if lang_match else ''
-            
-            line_numbers = 'ln:true' if 'linenumbers="True"' in match.group(1) else ''
-            
-            if line_numbers:
-                return f'```{lang} {line_numbers}\n{code_content}```'
-            else:
-                return f'```{lang}\n{code_content}```'
-                
-        content = re.sub(r'\{\{\{code: ([^\n]*)\n(.*?)\}\}\}', replace_code_block, content, flags=re.DOTALL)
-        
-        return content
-    
-    def convert_equations(self, content, file_path):
-        """Convert equations"""
-        # {{./equation.png?type=equation}} -> $$ ... $$
-        def replace_equation(match):
-            eq_path = match.group(1)
-            
-            # Remove query parameters
-            eq_path = eq_path.split('?')[0]
-            
-            # Construct full path
-            if eq_path.startswith('./'):
-                # In Zim Wiki, ./ is relative to the current file's directory
-                # e.g., for {{./image.png}} in dir/subdir/file.txt,
-                # the actual path is dir/subdir/image.png
-                eq_path = eq_path[2:]  # Remove ./ prefix
-                
-                # Check if a subdirectory with the same name as the file exists
-                # e.g., for file dir/subdir.txt, check for dir/subdir/ directory
-                file_name = file_path.stem
-                file_dir = file_path.parent
-                possible_subdir = file_dir / file_name
-                
-                if possible_subdir.is_dir():
-                    # If a same-name subdirectory exists, look for the equation file in it
-                    full_eq_path = possible_subdir / eq_path
-                    self.logger.debug(f"Searching in same-name subdirectory: {full_eq_path}")
-                else:
-                    # Otherwise, look in the current file's directory
-                    full_eq_path = file_path.parent / eq_path
-            else:
-                # If it doesn't start with ./, it might be an absolute path or other format
-                full_eq_path = Path(self.input_dir) / eq_path
-            
-            # Find the corresponding .tex file
-            tex_path = full_eq_path.with_suffix('.tex')
-            
-            # Debugging info
-            self.logger.debug(f"File path: {file_path}")
-            self.logger.debug(f"File name: {file_path.stem}")
-            self.logger.debug(f"Equation path: {eq_path}")
-            self.logger.debug(f"Full path: {full_eq_path}")
-            self.logger.debug(f"TEX file path: {tex_path}")
-            self.logger.debug(f"TEX file exists: {tex_path.exists()}")
-            
-            if tex_path.exists():
-                try:
-                    with open(tex_path, 'r', encoding='utf-8') as f:
-                        tex_content = f.read().strip()
-                    
-                    # Mark this equation file as processed
-                    self.processed_equations.add(str(tex_path))
-                    # Also mark the corresponding png file as processed
-                    self.processed_equations.add(str(full_eq_path))
-                    
-                    self.logger.debug(f"Marked as processed: TEX={tex_path}, PNG={full_eq_path}")
-                    
-                    return f'$$\n{tex_content}\n$$'
-                except Exception as e:
-                    self.logger.warning(f"Error reading equation file: {tex_path}, {str(e)}")
-                    return match.group(0)
-            else:
-                self.logger.warning(f"Equation file not found: {tex_path}")
-                return match.group(0)
-                
-        content = re.sub(r'\{\{(.+?)\?type=equation\}\}', replace_equation, content)
-        
-        return content
-    
-    def convert_tables(self, content):
-        """Convert table format"""
-        # The table formats of Zim and Obsidian are basically the same, but colons in the separator line need to be removed
-        def replace_table_alignment(match):
-            # Match the entire table separator line and remove all colons
-            line = match.group(0)
-            return line.replace(':', '-')
-            
-        # Match the table separator line, e.g., |:-----|:-----|:-----|
-        # Use multiline mode to ensure only table separator lines are matched
-        content = re.sub(r'^\|[-:|]+\|$', replace_table_alignment, content, flags=re.MULTILINE)
-        
-        # New: Replace \n in table cells with <br>
-        processed_lines = []
-        for line in content.splitlines():
-            # Check if it is a table row and not a separator row
-            # A table row is defined as: starts with | and ends with | after stripping whitespace
-            stripped_line = line.strip()
-            if stripped_line.startswith('|') and \
-               stripped_line.endswith('|') and \
-               not re.match(r'^\|[-:|]+\|$', stripped_line):
-                # It is a table data row or header row.
-                # In Zim's .txt format, newlines within cells are \n.
-                # Directly replace \n in the line with <br>.
-                processed_lines.append(line.replace('\\n', '<br>'))
-            else:
-                # Separator row or non-table row
-                processed_lines.append(line)
-        
-        content = '\n'.join(processed_lines)
-        
-        return content
-    
-    def convert_links(self, content, file_path):
-        """Convert link format"""
-        # Handle top-level links: [[:page]] -> [[page]]
-        content = re.sub(r'\[\[:([^\]]+)\]\]', r'[[\1]]', content)
-        
-        # Handle subpage links: [[+subpage]] -> [[subpage]]
-        content = re.sub(r'\[\[\+([^\]]+)\]\]', r'[[\1]]', content)
-        
-        # Handle links with paths: [[path:page]] -> [[path/page]]
-        def _replace_zim_path_colons(match):
-            full_match_content = match.group(1)
-            # Exclude URLs (e.g., http://, ftp://) and mailto links
-            if re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', full_match_content) or \
-               re.match(r'^mailto:', full_match_content, re.IGNORECASE):
-                return match.group(0)  # Return the original full match, e.g., "[[http://example.com]]"
-
-            # For Zim-style paths like "path:to:note", replace colons with slashes
-            return f'[[{full_match_content.replace(":", "/")}]]'
-
-        # Regex to find links like [[path:to:note]] or [[..:sibling:page]]
-        # It captures content between [[ and ]] that contains one or more colons
-        # and does not contain '|' (ensured by [^:\]|]+).
-        # Group 1: The full path string, e.g., "path:to:note"
-        # The (?:[^:\]|]+\:) part matches "segment:" (where segment contains no :, ], |)
-        # The + ensures there is at least one such "segment:"
-        # The [^:\]|]+ part matches the final segment after the last colon.
-        content = re.sub(r'\[\[((?:[^:\]|]+\:)+[^:\]|]+)\]\]', _replace_zim_path_colons, content)
-        
-        # Links with display text remain unchanged: [[link|text]]
-        
-        return content
-    
-    def add_frontmatter(self, content, metadata):
-        """Add Obsidian frontmatter"""
-        if not metadata:
-            return content
-            
-        # Create YAML frontmatter
-        frontmatter = yaml.dump(metadata, allow_unicode=True, sort_keys=False).strip()
-        
-        # Prepend to content
-        return f"---\n{frontmatter}\n---\n\n{content}"
-    
-    def copy_attachments(self):
-        """Copy attachment files to the output directory"""
-        self.logger.info("Copying attachment files")
-        
-        # Copy all non-.txt and non-.zim files
-        for attachment in self.input_dir.glob('**/*'):
-            # Skip directories
-            if attachment.is_dir():
-                continue
-                
-            # Skip Zim Wiki files
-            if attachment.suffix in ['.txt', '.zim']:
-                continue
-                
-            # Skip .tex files (equation source files)
-            if attachment.suffix == '.tex':
-                continue
-                
-            # Skip processed equation files
-            if str(attachment) in self.processed_equations:
-                self.logger.debug(f"Skipping processed equation file: {attachment}")
-                continue
-                
-            # Skip png files related to equations
-            if attachment.suffix == '.png' and attachment.with_suffix('.tex').exists():
-                self.logger.debug(f"Skipping png file related to equation: {attachment}")
-                continue
-                
-            # Get relative path
-            rel_path = attachment.relative_to(self.input_dir)
-            
-            # Add debug logs
-            self.logger.debug(f"Attachment relative path: {rel_path}")
-            self.logger.debug(f"Attachment parent directory: {rel_path.parent}")
-            
-            # Check if it needs to be moved to the parent directory
-            if len(rel_path.parts) > 1:
-                # Get filename
-                filename = rel_path.name
-                # Calculate parent directory path
-                parent_dir = rel_path.parent
-                self.logger.debug(f"Attachment should be moved to parent directory: {parent_dir} -> {parent_dir.parent}")
-                
-                # Create new target path (move to parent directory)
-                target_path = self.output_dir / parent_dir.parent / filename
-                self.logger.debug(f"New target path: {target_path}")
-            else:
-                # If already in the top-level directory, keep the original path
-                target_path = self.output_dir / rel_path
-                self.logger.debug(f"Attachment is already in the top-level directory, keeping original path: {target_path}")
-            
-            # Ensure the target directory exists
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            try:
-                # Copy file
-                shutil.copy2(attachment, target_path)
-                self.logger.debug(f"Copied attachment: {attachment} -> {target_path}")
-            except Exception as e:
-                self.logger.error(f"Error copying attachment: {attachment}, {str(e)}")
-
-    def rename_obsidian_notes(self):
-        """
-        Iterate through the output Obsidian notes, extract the first H1 title as the note name,
-        and rename the .md file and its corresponding folder using that name.
-        """
-        self.logger.info("Starting to rename Obsidian notes...")
-        for md_file_path in self.output_dir.glob('**/*.md'):
-            if not md_file_path.is_file():
-                continue
-
-            self.logger.debug(f"Processing file for renaming: {md_file_path}")
-            try:
-                with open(md_file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Extract the first H1 title
-                h1_match = re.search(r'^# (.*)', content, re.MULTILINE)
-                if h1_match:
-                    new_name_raw = h1_match.group(1).strip()
-                    # Sanitize the filename by removing illegal characters
-                    new_name_sanitized = re.sub(r'[\\/:*?"<>|]', '_', new_name_raw)
-                    # Avoid excessively long or empty filenames
-                    if not new_name_sanitized:
-                        self.logger.warning(f"Extracted H1 title is empty or contains only illegal characters, skipping rename: {md_file_path}")
-                        continue
-                    new_name = new_name_sanitized[:200] # Limit filename length
-
-                    old_name_stem = md_file_path.stem
-                    new_file_path = md_file_path.with_name(new_name + '.md')
-                    
-                    # Check if the new filename is different from the old one
-                    if md_file_path == new_file_path:
-                        self.logger.debug(f"Filename is already the target name, no rename needed: {md_file_path}")
-                        continue
-
-                    # Rename the .md file
-                    if new_file_path.exists():
-                        self.logger.warning(f"Target file {new_file_path} already exists, skipping rename of {md_file_path} to avoid overwrite")
-                        continue
-                    
-                    md_file_path.rename(new_file_path)
-                    self.logger.info(f"File renamed: {md_file_path} -> {new_file_path}")
-                    
-                    # Check for and rename the corresponding folder
-                    old_dir_path = md_file_path.with_name(old_name_stem) # Use the old stem to construct the directory path
-                    if old_dir_path.is_dir() and old_dir_path.name == old_name_stem : # Ensure it's the corresponding folder
-                        new_dir_path = new_file_path.with_name(new_name)
-                        if new_dir_path.exists() and new_dir_path.is_dir():
-                             self.logger.warning(f"Target folder {new_dir_path} already exists, skipping rename of {old_dir_path} to avoid overwrite")
-                        elif new_dir_path.exists() and not new_dir_path.is_dir():
-                            self.logger.warning(f"Target path {new_dir_path} already exists and is not a folder, skipping rename of {old_dir_path}")
-                        else:
-                            old_dir_path.rename(new_dir_path)
-                            self.logger.info(f"Folder renamed: {old_dir_path} -> {new_dir_path}")
-                else:
-                    self.logger.debug(f"No H1 title found in file {md_file_path}, skipping rename.")
-            except Exception as e:
-                self.logger.error(f"Error renaming note: {md_file_path}, {str(e)}")
-        self.logger.info("Obsidian note renaming complete.")
-
-def main():
-    """Main function"""
-    parser = argparse.ArgumentParser(description="Zim Wiki to Obsidian Converter.")
-    parser.add_argument("input_dir", help="Zim Wiki notebook directory.")
-    parser.add_argument("output_dir", help="Obsidian vault output directory.")
-    parser.add_argument("--log-level", default="info", choices=['debug', 'info', 'warning', 'error', 'critical'], help="Set the logging level.")
-    parser.add_argument("--log-file", help="Path to the log file.")
-    
-    args = parser.parse_args()
-    
-    # Ensure output directory exists
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Set default log file path in the output directory
-    log_file = args.log_file
-    if log_file is None:
-        log_file = str(output_dir / "zim2obsidian.log")
-        # log_file = str("zim2obsidian.log")
-    
-    # Setup logging
-    logger = setup_logging(args.log_level, log_file)
-    logger.info(f"Log file path: {log_file}")
-    
-    # Create converter and execute conversion
-    converter = ZimToObsidianConverter(args.input_dir, args.output_dir, logger)
-    converter.convert_notebook()
-
-if __name__ == '__main__':
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zim Wiki to Obsidian Converter
+
+This script converts Zim Wiki notebooks to Obsidian vaults.
+"""
+
+
+
+import os
+import re
+import atexit
+import ctypes
+import ctypes.util
+import errno
+import shutil
+import argparse
+import logging
+import logging.handlers  # Import handlers module
+import datetime
+import functools
+import yaml
+from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Precompiled regular expressions
+# Compiling once at import time avoids re-parsing (or re.cache lookups for)
+# every pattern on every file of a multi-file conversion.
+
+# Metadata extraction
+CREATION_DATE_RE = re.compile(r'Creation-Date: (.+)')
+ZIM_H1_RE = re.compile(r'^====== (.+?) ======$', re.MULTILINE)
+FIRST_LINE_RE = re.compile(r'^\s*(.+?)\s*$', re.MULTILINE)
+CREATED_LINE_RE = re.compile(
+    r'Created\s+(?:.+?)\s+(\d{1,2})\s+(.+?)\s+(\d{4})',
+    re.IGNORECASE
+)
+
+# Zim header
+HEADER_END_RE = re.compile(r'\n\n')
+
+# First H1 of a converted note, used to record the title for the rename
+# pass. Searched only over the first few hundred bytes: the H1 sits on
+# the first line after the frontmatter, and the cap keeps notes without
+# one from being scanned end to end.
+MD_H1_RE = re.compile(r'^# (.+)$', re.MULTILINE)
+MD_H1_WINDOW = 512
+
+# Helper patterns used inside the master-scanner handlers
+IMAGE_WIDTH_RE = re.compile(r'width=(\d+)')
+CODE_BLOCK_RE = re.compile(r'\{\{\{code: ([^\n]*)\n(.*?)\}\}\}', re.DOTALL)
+CODE_LANG_RE = re.compile(r'lang="([^"]+)"')
+
+# Tables: separator lines, and data/header rows (anything else starting
+# and ending with '|' after surrounding whitespace)
+TABLE_SEPARATOR_RE = re.compile(r'^\|[-:|]+\|$', re.MULTILINE)
+TABLE_DATA_ROW_RE = re.compile(r'^[ \t]*\|(?![-:|]+\|[ \t]*$)[^\n]*\|[ \t]*$', re.MULTILINE)
+
+# Links
+URL_SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*://')
+MAILTO_RE = re.compile(r'^mailto:', re.IGNORECASE)
+
+# Master scanner pattern.
+# All conversions except tables run as alternatives of one pattern, so the
+# whole document is walked once instead of once per construct. Block
+# constructs (code, images, attachments, links) come first so the inline
+# branches below never re-match text inside them. Branch names are looked
+# up via match.lastgroup, so each branch carries exactly one named group;
+# the handlers slice or re-parse the (short) matched text instead.
+#
+# The non-anchored branches are shared with INLINE_RE below, which the
+# handlers re-run over the inner text of constructs that may themselves
+# contain markup (italic and highlight spans): the master scanner
+# consumes such a span whole, so its contents have to be converted by
+# the handler rather than by further master matches.
+_INLINE_BRANCHES = (
+    r'(?P<image>\{\{.+?\}\})'
+    r'|(?P<attach>\[\[\./.+?\]\])'
+    r'|(?P<link>\[\[[^\]]+\]\])'
+    r'|(?P<italic>//.+?//)'
+    r'|(?P<highlight>__.+?__)'
+    r"|(?P<code_span>''.+?'')"
+    r'|(?P<subscript>[A-Za-z0-9]_\{.+?\})'
+    r'|(?P<superscript>[A-Za-z0-9]\^\{.+?\})'
+    r'|(?P<tag>@\w+)'
+)
+
+MASTER_RE = re.compile(
+    r'(?P<codeblk>\{\{\{code: [^\n]*\n(?s:.*?)\}\}\})'
+    # One branch covers H1-H5; the named group captures the leading '='
+    # run and the backreference requires a matching run at the end of
+    # the line, so the handler derives the level from the run length
+    r'|^(?P<heading>={2,6}) .+? (?P=heading)$'
+    r'|(?P<checkbox>^[ \t]*\[[ *x><]\])'
+    r'|(?P<list>^\* )'
+    r'|' + _INLINE_BRANCHES,
+    re.MULTILINE
+)
+
+# The nested scanner deliberately omits the line-anchored branches
+# (headings, checkboxes, lists): a fragment handed to it starts
+# mid-line, where those could not have matched in the original document
+INLINE_RE = re.compile(_INLINE_BRANCHES)
+
+# Signature at the start of every Zim Wiki file
+ZIM_SIGNATURE = b'Content-Type: text/x-zim-wiki'
+
+# Replacement text for each checkbox marker. All five markers are matched
+# by the single checkbox alternative of MASTER_RE, so one scan handles
+# what used to take five MULTILINE substitutions over the whole document.
+CHECKBOX_MAP = {
+    ' ': '- [ ]',
+    '*': '- [x]',
+    'x': '- [-]',
+    '>': '- [>]',
+    '<': '- [<]',
+}
+
+# Month mapping for the "Created ..." date fallback, can be extended as
+# needed. Keys are pre-lowercased so the lookup only lowercases the
+# month string from the file once.
+MONTH_MAP = {
+    "一月": 1, "二月": 2, "三月": 3, "四月": 4,
+    "五月": 5, "六月": 6, "七月": 7, "八月": 8,
+    "九月": 9, "十月": 10, "十一月": 11, "十二月": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4,
+    "may": 5, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+# Translation table mapping filesystem-illegal characters to '_';
+# str.translate is considerably faster than a character-class re.sub
+FILENAME_SANITIZE_TABLE = str.maketrans({c: '_' for c in '\\/:*?"<>|'})
+
+@functools.lru_cache(maxsize=4096)
+def _sanitize_title(title):
+    """
+    Return a title as a filesystem-safe note name ('' if nothing
+    survives). Cached because titles repeat across real vaults
+    ("Notes", "Untitled", date stems), and repeats then cost a dict
+    lookup instead of a translation pass.
+    """
+    # The slice keeps filenames from growing excessively long
+    return title.translate(FILENAME_SANITIZE_TABLE)[:200]
+
+def _basename(path):
+    """
+    Return the final component of a Zim path
+
+    Zim references use '/' (or '\\' when written on Windows), so two
+    rpartition calls cover both without dispatching through os.path.
+    """
+    return path.rpartition('/')[2].rpartition('\\')[2]
+
+# The rename pass works with names relative to an open parent-directory
+# descriptor where the platform allows it; Windows supports none of the
+# pieces (O_DIRECTORY, dir_fd arguments, fd-based scandir), so the pass
+# falls back to full paths there.
+_DIR_FD_RENAMES = (
+    hasattr(os, 'O_DIRECTORY')
+    and os.rename in os.supports_dir_fd
+    and os.stat in os.supports_dir_fd
+    and os.scandir in os.supports_fd
+)
+
+# renameat2(2) with RENAME_NOREPLACE performs the "target must not
+# exist" check and the rename in one atomic syscall. The libc symbol is
+# Linux-only, so resolve it once at import and fall back to a separate
+# check plus rename elsewhere (or on filesystems that reject the flag).
+RENAME_NOREPLACE = 1
+try:
+    _LIBC = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _LIBC.renameat2
+except (OSError, TypeError, AttributeError):
+    _LIBC = None
+
+def _rename_noreplace(old_name, new_name, dir_fd):
+    """
+    Rename old_name to new_name without clobbering: raises
+    FileExistsError if the target already exists. The names are
+    relative to dir_fd, or full paths when dir_fd is None.
+    """
+    global _LIBC
+    if _LIBC is not None:
+        # Full paths make renameat2 ignore the directory argument, so
+        # AT_FDCWD is a safe stand-in when no descriptor is available
+        fd = dir_fd if dir_fd is not None else getattr(os, 'AT_FDCWD', -100)
+        result = _LIBC.renameat2(
+            fd, os.fsencode(old_name),
+            fd, os.fsencode(new_name),
+            RENAME_NOREPLACE
+        )
+        if result == 0:
+            return
+        err = ctypes.get_errno()
+        if err not in (errno.ENOSYS, errno.EINVAL):
+            raise OSError(err, os.strerror(err), new_name)
+        # Kernel or filesystem does not support the flag; use the
+        # two-syscall path from here on
+        _LIBC = None
+    try:
+        os.stat(new_name, dir_fd=dir_fd, follow_symlinks=False)
+    except FileNotFoundError:
+        pass
+    else:
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), new_name)
+    os.rename(old_name, new_name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+
+def _iter_files(root):
+    """
+    Yield the paths (as strings) of all files under a directory tree
+
+    os.scandir is used instead of Path.glob because glob builds a Path
+    object for every intermediate directory and file; scandir yields
+    plain strings and gets the file/directory distinction for free from
+    the directory entry, without an extra stat per entry. Like glob,
+    unreadable directories are skipped (with a warning) rather than
+    aborting the walk, and symlinks to directories are not followed —
+    they are neither yielded as files nor descended into, since
+    descending would duplicate everything reachable through the link
+    and loop on symlink cycles.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError as e:
+            logging.getLogger('zim2obsidian').warning(
+                "Cannot list directory %s, skipping: %s", current, e)
+            continue
+        with it:
+            for entry in it:
+                # The no-follow check answers from the directory entry
+                # itself; only symlinks pay a stat, to keep links to
+                # directories out of the yielded files
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                if entry.is_symlink():
+                    try:
+                        if entry.is_dir():
+                            continue
+                    except OSError:
+                        pass
+                yield entry.path
+
+# Everything a master-scanner handler needs to know about the file being
+# converted. A plain tuple of values rather than the converter itself, so
+# the handlers are free functions with no attribute lookups on the hot path.
+ConvertContext = namedtuple(
+    'ConvertContext',
+    ['file_path', 'input_dir', 'processed_equations', 'logger']
+)
+
+def _convert_nested(text, ctx):
+    """
+    Convert the constructs nested inside an already-matched span
+
+    Runs the inline subset of the master scanner over the span's inner
+    text, so e.g. //H_{2}O// and __see @tag__ convert their contents
+    the same way they would outside the span.
+    """
+    return INLINE_RE.sub(lambda m: _dispatch(m, ctx), text)
+
+def _sub_heading(match, ctx):
+    """Convert a heading line, e.g. '====== Title ======' -> '# Title'"""
+    text = match.group(0)
+    eq_count = len(match.group('heading'))
+    title = text[eq_count + 1:-(eq_count + 1)]
+    # 6 equals signs -> H1, 5 -> H2, ..., 2 -> H5. The heading branch
+    # consumes the whole line, so links, images and inline formatting in
+    # the title are converted by the nested scanner.
+    return '#' * (7 - eq_count) + ' ' + _convert_nested(title, ctx)
+
+def _sub_checkbox(match, ctx):
+    """Convert a checkbox marker, e.g. '[*]' -> '- [x]'"""
+    text = match.group(0)
+    # The match is the indent plus the three-character marker
+    return text[:-3] + CHECKBOX_MAP[text[-2]]
+
+def _sub_list(match, ctx):
+    """Convert an unordered list marker: '* ' -> '- '"""
+    # Ordered list remains unchanged: 1. item
+    return '- '
+
+def _sub_italic(match, ctx):
+    """Italic: //text// -> *text*"""
+    return f'*{_convert_nested(match.group(0)[2:-2], ctx)}*'
+
+def _sub_highlight(match, ctx):
+    """Highlight: __text__ -> ==text=="""
+    return f'=={_convert_nested(match.group(0)[2:-2], ctx)}=='
+
+def _sub_code_span(match, ctx):
+    """Code: ''text'' -> `text`"""
+    # The contents stay literal: a code span is code, so tags and other
+    # markup inside it are not converted (same policy as code blocks)
+    return f'`{match.group(0)[2:-2]}`'
+
+def _sub_subscript(match, ctx):
+    """Subscript: A_{subscript} -> A<sub>subscript</sub>"""
+    text = match.group(0)
+    return f'{text[0]}<sub>{text[3:-1]}</sub>'
+
+def _sub_superscript(match, ctx):
+    """Superscript: B^{superscript} -> B<sup>superscript</sup>"""
+    text = match.group(0)
+    return f'{text[0]}<sup>{text[3:-1]}</sup>'
+
+def _sub_tag(match, ctx):
+    """Tag: @tag -> #tag"""
+    return '#' + match.group(0)[1:]
+
+def _sub_image(match, ctx):
+    """Convert an image reference: {{./image.png}} -> ![[image.png]]"""
+    img_path_full = match.group(0)[2:-2] # e.g., "./image.png?width=800" or "./image.png"
+
+    # Equation images are rendered as embedded LaTeX instead
+    if img_path_full.endswith('?type=equation'):
+        return _sub_equation(match, img_path_full[:-len('?type=equation')], ctx)
+    if '?type=equation' in img_path_full:
+        return match.group(0)
+
+    img_path_base = img_path_full
+
+    # Try to extract width parameter
+    # {{.\image.png?width=800}} -> ![[image.png|800]]
+    width_match = IMAGE_WIDTH_RE.search(img_path_full)
+    width_value = None
+    if width_match:
+        width_value = width_match.group(1)
+
+    # Remove the query parameter part to get the pure image path
+    # {{.\image.png?height=30}} -> ![[image.png]] (height is ignored)
+    if '?' in img_path_base:
+        img_path_base = img_path_base.split('?', 1)[0]
+
+    # Handle relative paths
+    if img_path_base[:2] == './':
+        img_path_base = img_path_base[2:]
+
+    img_name = _basename(img_path_base) # e.g., "image.png"
+
+    if width_value:
+        return f'![[{img_name}|{width_value}]]'
+    else:
+        # Cases with height (ignored) or no parameters
+        return f'![[{img_name}]]'
+
+def _sub_attachment(match, ctx):
+    """Convert an attachment reference: [[./file.pdf]] -> ![[file.pdf]]"""
+    # The match is "[[./<path>]]"
+    attachment_path = match.group(0)[4:-2]
+
+    # Get attachment filename
+    attachment_name = _basename(attachment_path)
+
+    return f'![[{attachment_name}]]'
+
+def _sub_code_block(match, ctx):
+    """Convert a code block"""
+    # {{{code: lang="sh" linenumbers="True" ... }}} -> ```sh ln:true ... ```
+    block_match = CODE_BLOCK_RE.match(match.group(0))
+    code_attrs = block_match.group(1)
+    code_content = block_match.group(2)
+
+    # Extract language and line number settings
+    lang_match = CODE_LANG_RE.search(code_attrs)
+    lang = lang_match.group(1) if lang_match else ''
+
+    line_numbers = 'ln:true' if 'linenumbers="True"' in code_attrs else ''
+
+    if line_numbers:
+        return f'```{lang} {line_numbers}\n{code_content}```'
+    else:
+        return f'```{lang}\n{code_content}```'
+
+def _sub_equation(match, eq_path, ctx):
+    """Convert an equation: {{./equation.png?type=equation}} -> $$ ... $$"""
+    file_path = ctx.file_path
+
+    # Remove query parameters
+    eq_path = eq_path.split('?')[0]
+
+    # Construct full path
+    if eq_path[:2] == './':
+        # In Zim Wiki, ./ is relative to the current file's directory
+        # e.g., for {{./image.png}} in dir/subdir/file.txt,
+        # the actual path is dir/subdir/image.png
+        eq_path = eq_path[2:]  # Remove ./ prefix
+
+        # Check if a subdirectory with the same name as the file exists
+        # e.g., for file dir/subdir.txt, check for dir/subdir/ directory
+        file_name = file_path.stem
+        file_dir = file_path.parent
+        possible_subdir = file_dir / file_name
+
+        if possible_subdir.is_dir():
+            # If a same-name subdirectory exists, look for the equation file in it
+            full_eq_path = possible_subdir / eq_path
+            ctx.logger.debug("Searching in same-name subdirectory: %s", full_eq_path)
+        else:
+            # Otherwise, look in the current file's directory
+            full_eq_path = file_path.parent / eq_path
+    else:
+        # If it doesn't start with ./, it might be an absolute path or other format
+        full_eq_path = Path(ctx.input_dir) / eq_path
+
+    # Find the corresponding .tex file
+    tex_path = full_eq_path.with_suffix('.tex')
+
+    # Debugging info
+    ctx.logger.debug("File path: %s", file_path)
+    ctx.logger.debug("File name: %s", file_path.stem)
+    ctx.logger.debug("Equation path: %s", eq_path)
+    ctx.logger.debug("Full path: %s", full_eq_path)
+    ctx.logger.debug("TEX file path: %s", tex_path)
+    ctx.logger.debug("TEX file exists: %s", tex_path.exists())
+
+    if tex_path.exists():
+        try:
+            with open(tex_path, 'r', encoding='utf-8') as f:
+                tex_content = f.read().strip()
+
+            # Mark this equation file as processed
+            ctx.processed_equations.add(str(tex_path))
+            # Also mark the corresponding png file as processed
+            ctx.processed_equations.add(str(full_eq_path))
+
+            ctx.logger.debug("Marked as processed: TEX=%s, PNG=%s", tex_path, full_eq_path)
+
+            return f'$$\n{tex_content}\n$$'
+        except Exception as e:
+            ctx.logger.warning("Error reading equation file: %s, %s", tex_path, str(e))
+            return match.group(0)
+    else:
+        ctx.logger.warning("Equation file not found: %s", tex_path)
+        return match.group(0)
+
+def _sub_link(match, ctx):
+    """Convert link format"""
+    inner = match.group(0)[2:-2]
+    converted = inner
+
+    # Handle top-level links ([[:page]] -> [[page]]) and
+    # subpage links ([[+subpage]] -> [[subpage]])
+    if converted[:1] in (':', '+'):
+        converted = converted[1:]
+
+    # Handle links with paths: [[path:page]] -> [[path/page]]
+    # The inner text must look like "path:to:note" (one or more colons,
+    # no '|', no empty segments); URLs (e.g., http://, ftp://) and
+    # mailto links are excluded. Cheap substring checks and one split
+    # replace the old '(?:[^:\]|]+:)+[^:\]|]+' pattern, whose nested
+    # repetition could backtrack quadratically on pathological input
+    # (the shape possessive quantifiers exist to defuse); the split is
+    # linear by construction and most links have no colon and exit on
+    # the first check.
+    if ':' in converted and '|' not in converted and \
+       not URL_SCHEME_RE.match(converted) and \
+       not MAILTO_RE.match(converted):
+        segments = converted.split(':')
+        if all(segments):
+            # For Zim-style paths like "path:to:note", replace colons with slashes
+            converted = '/'.join(segments)
+
+    # Links with display text remain unchanged: [[link|text]]
+    if converted is inner:
+        return match.group(0)
+    return f'[[{converted}]]'
+
+# Handlers for the master scanner, keyed by branch name
+MASTER_HANDLERS = {
+    'codeblk': _sub_code_block,
+    'image': _sub_image,
+    'attach': _sub_attachment,
+    'link': _sub_link,
+    'heading': _sub_heading,
+    'checkbox': _sub_checkbox,
+    'list': _sub_list,
+    'italic': _sub_italic,
+    'highlight': _sub_highlight,
+    'code_span': _sub_code_span,
+    'subscript': _sub_subscript,
+    'superscript': _sub_superscript,
+    'tag': _sub_tag,
+}
+
+def _dispatch(match, ctx):
+    """Dispatch a master-scanner match to the handler for its branch"""
+    return MASTER_HANDLERS[match.lastgroup](match, ctx)
+
+# Setup logging
+def setup_logging(log_level, log_file=None):
+    """
+    Setup logging
+    
+    Args:
+        log_level: The logging level ('debug', 'info', 'warning', 'error', 'critical')
+        log_file: Path to the log file. If None, a default path is used.
+    
+    Returns:
+        A configured logger object
+    """
+    # Map log level strings to logging constants
+    log_levels = {
+        'debug': logging.DEBUG,
+        'info': logging.INFO,
+        'warning': logging.WARNING,
+        'error': logging.ERROR,
+        'critical': logging.CRITICAL
+    }
+    level = log_levels.get(log_level.lower(), logging.INFO)
+    
+    # Create logger
+    logger = logging.getLogger('zim2obsidian')
+    logger.setLevel(level)
+    
+    # Clear existing handlers to avoid duplication
+    if logger.handlers:
+        logger.handlers.clear()
+    
+    # Log format
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+    
+    # File handler (with rotation)
+    if log_file is None:
+        log_file = "zim2obsidian.log"
+    
+    try:
+        # Use RotatingFileHandler instead of FileHandler to support log rotation
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            # mode='a',  # Append mode, do not overwrite existing logs
+            mode='w',  # Overwrite
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=3,  # Keep 3 backup files
+            encoding='utf-8'
+        )
+        file_handler.setLevel(level)
+        file_handler.setFormatter(formatter)
+        # Buffer the file writes: per-record disk writes would serialize
+        # with the conversion and rename work, so records are collected
+        # in memory and flushed to the file handler in batches. Anything
+        # warning-or-worse flushes immediately, and the atexit hook
+        # drains the buffer (and closes the target) on normal exits;
+        # process-pool workers flush explicitly in _convert_one because
+        # they leave via os._exit, which skips atexit hooks.
+        memory_handler = logging.handlers.MemoryHandler(
+            capacity=2048,
+            flushLevel=logging.WARNING,
+            target=file_handler
+        )
+        memory_handler.setLevel(level)
+        logger.addHandler(memory_handler)
+        atexit.register(memory_handler.close)
+    except (IOError, PermissionError) as e:
+        # If the log file cannot be created, log an error but do not interrupt the program
+        print(f"Warning: Could not create log file {log_file}: {e}")
+        print(f"Logging will only be output to the console")
+    
+    return logger
+
+class ZimToObsidianConverter:
+    """Converter class for Zim Wiki to Obsidian"""
+    
+    def __init__(self, input_dir, output_dir, logger):
+        """Initialize the converter"""
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.logger = logger
+        
+        # Ensure the output directory exists
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Store paths of processed equation files
+        self.processed_equations = set()
+
+        # Memoized os.stat results, keyed by path string
+        self._stat_cache = {}
+
+        # First H1 title of each converted note (None when absent),
+        # keyed by output path string; recorded while the converted
+        # content is still in memory so the rename pass does not have
+        # to read the files back
+        self._note_titles = {}
+
+    def _stat(self, path):
+        """Return the stat result for a path, memoized per converter"""
+        result = self._stat_cache.get(path)
+        if result is None:
+            result = os.stat(path)
+            self._stat_cache[path] = result
+        return result
+        
+    def convert_notebook(self):
+        """Convert the entire notebook"""
+        self.logger.info("Starting conversion: %s -> %s", self.input_dir, self.output_dir)
+
+        # Collect all Zim Wiki files
+        zim_files = []
+        for zim_file in _iter_files(self.input_dir):
+            if not zim_file.endswith('.txt'):
+                continue
+
+            # Skip non-Zim Wiki files
+            if not self._is_zim_file(zim_file):
+                self.logger.debug("Skipping non-Zim file: %s", zim_file)
+                continue
+
+            self.logger.info("Processing file: %s", zim_file)
+            zim_files.append(zim_file)
+
+        # Each file is independent (own I/O, own regex work, own output
+        # path), so convert them across a process pool. The workers send
+        # their processed-equation paths back so copy_attachments can
+        # skip those files.
+        if zim_files:
+            worker_args = [(p, str(self.input_dir), str(self.output_dir))
+                           for p in zim_files]
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for equations, titles in executor.map(_convert_one, worker_args, chunksize=16):
+                    self.processed_equations.update(equations)
+                    self._note_titles.update(titles)
+
+        # Copy attachment files
+        self.copy_attachments()
+        
+        self.logger.info("Conversion complete")
+
+        # Rename Obsidian notes
+        self.rename_obsidian_notes()
+    
+    def _is_zim_file(self, file_path):
+        """Check if a file is a Zim Wiki file"""
+        # Compare the signature bytes directly; opening in binary mode
+        # skips the TextIOWrapper/codec setup that a text-mode open pays
+        # just to read the first 29 bytes.
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read(len(ZIM_SIGNATURE)) == ZIM_SIGNATURE
+        except Exception as e:
+            self.logger.warning("Error checking file type: %s, %s", file_path, str(e))
+            return False
+    
+    def convert_file(self, zim_file):
+        """Convert a single Zim Wiki file to Obsidian format"""
+        try:
+            # Read Zim file content. Decoding the raw bytes in one go
+            # skips the TextIOWrapper state machine and its newline
+            # translation; the converter works on '\n' text either way.
+            content = zim_file.read_bytes().decode('utf-8')
+
+            # Normalize Windows line endings (text mode used to do this)
+            if '\r' in content:
+                content = content.replace('\r\n', '\n')
+
+            # Get relative path
+            rel_path = zim_file.relative_to(self.input_dir)
+            
+            # Create the corresponding Obsidian file path
+            obsidian_file = self.output_dir / rel_path.with_suffix('.md')
+            obsidian_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Convert content
+            obsidian_content = self.convert_content(content, zim_file)
+            
+            # Write to Obsidian file in one encoded block, without
+            # routing the whole note through a buffered text writer
+            obsidian_file.write_bytes(obsidian_content.encode('utf-8'))
+
+            # Record the H1 title for the rename pass while the content
+            # is still in memory
+            title_match = MD_H1_RE.search(obsidian_content, 0, MD_H1_WINDOW)
+            if (title_match and title_match.end() == MD_H1_WINDOW
+                    and len(obsidian_content) > MD_H1_WINDOW):
+                # The window cut the title line short; redo uncapped
+                title_match = MD_H1_RE.search(obsidian_content)
+            self._note_titles[str(obsidian_file)] = \
+                title_match.group(1).strip() if title_match else None
+
+            self.logger.debug("Converted: %s -> %s", zim_file, obsidian_file)
+            
+        except Exception as e:
+            self.logger.error("Error converting file: %s, %s", zim_file, str(e))
+    
+    def convert_content(self, content, file_path):
+        """Convert Zim Wiki content to Obsidian format"""
+        # Find where the Zim Wiki header ends (the first blank line); the
+        # boundary is shared with extract_metadata so the header is only
+        # located once per file
+        header_match = HEADER_END_RE.search(content)
+        body_start = header_match.end() if header_match else 0
+
+        # Extract metadata
+        metadata = self.extract_metadata(content, body_start, file_path)
+
+        # Remove Zim Wiki header
+        content = content[body_start:]
+
+        # Convert all constructs in a single pass over the document
+        ctx = ConvertContext(file_path, self.input_dir,
+                             self.processed_equations, self.logger)
+        content = MASTER_RE.sub(lambda m: _dispatch(m, ctx), content)
+
+        # Tables need line-oriented post-processing, so they stay separate
+        content = self.convert_tables(content)
+
+        # Add Obsidian frontmatter
+        content = self.add_frontmatter(content, metadata)
+        
+        return content
+    
+    def extract_metadata(self, content, body_start, file_path):    # Fix: Use file modification time
+        """Extract metadata from Zim Wiki content"""
+        metadata = {}
+
+        # File modification time, computed at most once per file
+        mtime_dt = None
+
+        # Extract creation date
+        creation_date_match = CREATION_DATE_RE.search(content)
+        if creation_date_match:
+            date_str = creation_date_match.group(1).strip()
+            try:
+                # Parse ISO format date
+                dt = datetime.datetime.fromisoformat(date_str)
+                metadata['created'] = dt.strftime('%Y-%m-%dT%H:%M')
+                
+                # Get file modification time
+                mtime = self._stat(str(file_path)).st_mtime
+                mtime_dt = datetime.datetime.fromtimestamp(mtime)
+                metadata['updated'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
+                
+                self.logger.debug("File: %s, Extracted creation time from Creation-Date: %s, Modification time: %s", file_path, dt, mtime_dt)
+            except ValueError:
+                self.logger.warning("Could not parse date from Creation-Date: %s", date_str)
+
+        # If creation date is not extracted from Creation-Date, try parsing from under H1
+        if 'created' not in metadata:
+            # Skip the Zim Wiki header to avoid interfering with H1 title search
+            content_body = content[body_start:]
+            h1_match = ZIM_H1_RE.search(content_body)
+            if h1_match:
+                h1_end_pos = h1_match.end()
+                # Find the first line after the H1 title
+                next_line_match = FIRST_LINE_RE.search(content_body[h1_end_pos:])
+                if next_line_match:
+                    date_line = next_line_match.group(1).strip()
+                    # Match "Created Tuesday 21 November 2017" format
+                    # Updated regex to be more robust for day and month names
+                    date_pattern_match = CREATED_LINE_RE.search(date_line)
+                    if date_pattern_match:
+                        day = int(date_pattern_match.group(1))
+                        month_str = date_pattern_match.group(2)
+                        year = int(date_pattern_match.group(3))
+                        
+                        # Try a direct lookup first (e.g. "Jun", "十一月");
+                        # fall back to a containment scan for longer month
+                        # names like "November"
+                        month_str_low = month_str.strip().lower()
+                        month = MONTH_MAP.get(month_str_low)
+                        if month is None:
+                            for k, v in MONTH_MAP.items():
+                                if k in month_str_low:
+                                    month = v
+                                    break
+                        
+                        if month:
+                            try:
+                                dt = datetime.datetime(year, month, day, 0, 0, 0)
+                                metadata['created'] = dt.strftime('%Y-%m-%dT%H:%M')
+                                self.logger.info("File: %s, Extracted creation time from H1: %s", file_path, dt)
+                                # # If creation date is extracted from H1, ensure updated is also set
+                                # if 'updated' not in metadata:
+                                #     mtime = file_path.stat().st_mtime
+                                #     mtime_dt = datetime.datetime.fromtimestamp(mtime)
+                                #     metadata['updated'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
+                                #     self.logger.debug("File: %s, Set modification time (based on H1 creation time): %s", file_path, mtime_dt)
+                            except ValueError as e:
+                                self.logger.warning("Could not construct date from text under H1: %s, Error: %s", date_line, e)
+                        else:
+                            self.logger.warning("Could not parse month from text under H1: %s", date_line)
+                    else:
+                        self.logger.debug("Line under H1 '%s' does not match expected date format", date_line)
+                else:
+                    self.logger.debug("No content line after H1 title in file %s", file_path)
+            else:
+                self.logger.debug("H1 title not found in file %s", file_path)
+
+        # If 'updated' time is still missing, use file modification time as a fallback
+        if 'updated' not in metadata:
+            if mtime_dt is None:
+                mtime = self._stat(str(file_path)).st_mtime
+                mtime_dt = datetime.datetime.fromtimestamp(mtime)
+            metadata['updated'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
+            self.logger.debug("File: %s, Using file modification time as fallback for updated time: %s", file_path, mtime_dt)
+            # # If 'created' is also missing, use file modification time as well
+            # if 'created' not in metadata:
+            #     metadata['created'] = mtime_dt.strftime('%Y-%m-%dT%H:%M')
+            #     self.logger.debug("File: %s, Using file modification time as fallback for created time: %s", file_path, mtime_dt)
+
+        return metadata
+    
+    def convert_tables(self, content):
+        """Convert table format"""
+        # Every table row contains '|', so this C-level substring check
+        # lets table-less files skip both multiline scans below
+        if '|' not in content:
+            return content
+
+        # The table formats of Zim and Obsidian are basically the same, but colons in the separator line need to be removed
+        # Match the table separator line, e.g., |:-----|:-----|:-----|
+        # Use multiline mode to ensure only table separator lines are matched
+        content = TABLE_SEPARATOR_RE.sub(lambda m: m.group(0).replace(':', '-'), content)
+
+        # Replace \n in table cells with <br>.
+        # TABLE_DATA_ROW_RE matches data and header rows (lines that start
+        # and end with | after surrounding whitespace, excluding separator
+        # rows) directly, so files without tables cost a single scan
+        # instead of a Python-level loop over every line.
+        # In Zim's .txt format, newlines within cells are \n.
+        content = TABLE_DATA_ROW_RE.sub(lambda m: m.group(0).replace('\\n', '<br>'), content)
+
+        return content
+    
+    def add_frontmatter(self, content, metadata):
+        """Add Obsidian frontmatter"""
+        if not metadata:
+            return content
+
+        # The metadata values are plain ISO timestamp strings that need no
+        # quoting, so emit the YAML lines directly instead of spinning up
+        # the PyYAML emitter for every note; yaml.dump stays as a fallback
+        # for any value that would need quoting or escaping
+        if all(isinstance(v, str) and v and ': ' not in v and '\n' not in v
+               and v[0] not in '#&*!|>\'"%@` ' for v in metadata.values()):
+            frontmatter = '\n'.join(f'{k}: {v}' for k, v in metadata.items())
+        else:
+            # Create YAML frontmatter
+            frontmatter = yaml.dump(metadata, allow_unicode=True, sort_keys=False).strip()
+
+        # Prepend to content
+        return f"---\n{frontmatter}\n---\n\n{content}"
+    
+    def copy_attachments(self):
+        """Copy attachment files to the output directory"""
+        self.logger.info("Copying attachment files")
+
+        # Collect (source, target) pairs first; the copies themselves are
+        # dispatched to a thread pool below since this phase is I/O-bound
+        copy_jobs = []
+
+        # Walk the tree once and remember every .tex stem, so the
+        # equation-png check below is a set lookup instead of a stat
+        # syscall per png file
+        all_files = list(_iter_files(self.input_dir))
+        tex_stems = {os.path.splitext(p)[0] for p in all_files if p.endswith('.tex')}
+
+        # Copy all non-.txt and non-.zim files
+        for attachment_path in all_files:
+            stem, suffix = os.path.splitext(attachment_path)
+
+            # Skip Zim Wiki files
+            if suffix in ['.txt', '.zim']:
+                continue
+
+            # Skip .tex files (equation source files)
+            if suffix == '.tex':
+                continue
+
+            # Skip processed equation files
+            if attachment_path in self.processed_equations:
+                self.logger.debug("Skipping processed equation file: %s", attachment_path)
+                continue
+
+            # Skip png files related to equations
+            if suffix == '.png' and stem in tex_stems:
+                self.logger.debug("Skipping png file related to equation: %s", attachment_path)
+                continue
+
+            # Get relative path
+            attachment = Path(attachment_path)
+            rel_path = attachment.relative_to(self.input_dir)
+            
+            # Add debug logs
+            self.logger.debug("Attachment relative path: %s", rel_path)
+            self.logger.debug("Attachment parent directory: %s", rel_path.parent)
+            
+            # Check if it needs to be moved to the parent directory
+            if len(rel_path.parts) > 1:
+                # Get filename
+                filename = rel_path.name
+                # Calculate parent directory path
+                parent_dir = rel_path.parent
+                self.logger.debug("Attachment should be moved to parent directory: %s -> %s", parent_dir, parent_dir.parent)
+                
+                # Create new target path (move to parent directory)
+                target_path = self.output_dir / parent_dir.parent / filename
+                self.logger.debug("New target path: %s", target_path)
+            else:
+                # If already in the top-level directory, keep the original path
+                target_path = self.output_dir / rel_path
+                self.logger.debug("Attachment is already in the top-level directory, keeping original path: %s", target_path)
+            
+            # Ensure the target directory exists
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+
+            copy_jobs.append((attachment_path, target_path))
+
+        # Deduplicate by target before handing the jobs to the pool: two
+        # same-named attachments in sibling note folders flatten to the
+        # same parent-directory target, and concurrent copies into one
+        # path interleave their contents. Keeping the last job per
+        # target preserves the last-writer-wins result of the old
+        # serial loop.
+        jobs_by_target = {}
+        for attachment_path, target_path in copy_jobs:
+            key = str(target_path)
+            previous = jobs_by_target.get(key)
+            if previous is not None:
+                self.logger.warning(
+                    "Attachment target %s has multiple sources, keeping %s and dropping %s",
+                    target_path, attachment_path, previous[0])
+            jobs_by_target[key] = (attachment_path, target_path)
+        copy_jobs = list(jobs_by_target.values())
+
+        def copy_one(job):
+            attachment, target_path = job
+            try:
+                # Copy the file contents only; Obsidian does not care about
+                # the mtime/mode/xattr metadata that copy2 would replicate
+                # with extra syscalls per attachment
+                shutil.copyfile(attachment, target_path)
+                self.logger.debug("Copied attachment: %s -> %s", attachment, target_path)
+            except Exception as e:
+                self.logger.error("Error copying attachment: %s, %s", attachment, str(e))
+
+        if copy_jobs:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(copy_one, copy_jobs))
+
+    def rename_obsidian_notes(self):
+        """
+        Iterate through the output Obsidian notes, extract the first H1 title as the note name,
+        and rename the .md file and its corresponding folder using that name.
+        """
+        self.logger.info("Starting to rename Obsidian notes...")
+        # The conversion pass already visited every produced note, so the
+        # rename pass is driven from its recorded outputs instead of
+        # re-walking the vault: no directory-discovery traversal, and only
+        # the directories that actually contain notes are listed (once
+        # each, through the descriptor the batch opens anyway).
+        notes_by_parent = {}
+        for md_path in self._note_titles:
+            notes_by_parent.setdefault(os.path.dirname(md_path), []).append(md_path)
+
+        # Batches run in waves, one directory depth at a time, deepest
+        # first, and a wave only starts after the previous one finished.
+        # A folder is renamed by the batch of the directory containing
+        # it, i.e. one level above its contents, so the wait guarantees
+        # every batch inside the folder is done before the rename can
+        # run; mere deepest-first dispatch would still let a parent's
+        # batch race its children across pool workers. Within a wave,
+        # parents are sorted so consecutive batches share path prefixes
+        # and keep the dentry cache warm; notes inside a batch are
+        # sorted for the same reason (and for deterministic log order).
+        depth_waves = {}
+        for parent in notes_by_parent:
+            depth_waves.setdefault(parent.count(os.sep), []).append(parent)
+        for md_paths in notes_by_parent.values():
+            md_paths.sort()
+
+        note_titles = self._note_titles
+
+        def rename_one(md_path, parent, parent_entries, dir_fd):
+            """Rename one note (and its folder); return True if anything was renamed"""
+            # Plain strings throughout: the loop runs once per note, and
+            # pathlib's object construction per .with_name/.stem call is
+            # measurable overhead at that frequency
+            md_name = os.path.basename(md_path)
+
+            self.logger.debug("Processing file for renaming: %s", md_path)
+            try:
+                # The conversion pass recorded each note's H1 title, so
+                # no file is opened here at all
+                new_name_raw = note_titles[md_path]
+
+                if new_name_raw is not None:
+                    # Sanitize the filename by removing illegal characters
+                    new_name = _sanitize_title(new_name_raw)
+                    if not new_name:
+                        self.logger.warning("Extracted H1 title is empty or contains only illegal characters, skipping rename: %s", md_path)
+                        return False
+
+                    old_name_stem = md_name[:-3]
+                    new_md_name = new_name + '.md'
+
+                    # Check if the new filename is different from the old one
+                    if md_name == new_md_name:
+                        self.logger.debug("Filename is already the target name, no rename needed: %s", md_path)
+                        return False
+
+                    # Join by hand: parent is a clean directory path from
+                    # os.path.dirname, so the separator-handling logic in
+                    # os.path.join is dead weight here
+                    new_file_path = f'{parent}{os.sep}{new_md_name}'
+
+                    # Rename the .md file. The entry map doubles as a
+                    # negative cache: a name missing from it is known not
+                    # to exist, so the check is a set lookup rather than a
+                    # stat syscall per note. The no-replace rename repeats
+                    # the check atomically inside the syscall, closing the
+                    # window between the lookup and the rename.
+                    if new_md_name in parent_entries:
+                        self.logger.warning("Target file %s already exists, skipping rename of %s to avoid overwrite", new_file_path, md_path)
+                        return False
+
+                    try:
+                        if dir_fd is not None:
+                            _rename_noreplace(md_name, new_md_name, dir_fd)
+                        else:
+                            _rename_noreplace(md_path, new_file_path, None)
+                    except FileExistsError:
+                        self.logger.warning("Target file %s already exists, skipping rename of %s to avoid overwrite", new_file_path, md_path)
+                        return False
+                    # Keep the entry map in step with the rename
+                    parent_entries.pop(md_name, None)
+                    parent_entries[new_md_name] = False
+                    self.logger.info("File renamed: %s -> %s", md_path, new_file_path)
+
+                    # Check for and rename the corresponding folder
+                    if parent_entries.get(old_name_stem) is True: # Ensure it's the corresponding folder
+                        old_dir_path = f'{parent}{os.sep}{old_name_stem}'
+                        new_dir_path = f'{parent}{os.sep}{new_name}'
+                        # One lookup answers all three cases: True = a
+                        # folder is in the way, False = a file is in the
+                        # way, None = the target is free
+                        target_is_dir = parent_entries.get(new_name)
+                        if target_is_dir:
+                            self.logger.warning("Target folder %s already exists, skipping rename of %s to avoid overwrite", new_dir_path, old_dir_path)
+                        elif target_is_dir is not None:
+                            self.logger.warning("Target path %s already exists and is not a folder, skipping rename of %s", new_dir_path, old_dir_path)
+                        else:
+                            # Bare names relative to the batch descriptor:
+                            # the kernel resolves a single component
+                            # instead of re-walking the whole path
+                            if dir_fd is not None:
+                                os.rename(old_name_stem, new_name,
+                                          src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+                            else:
+                                os.rename(old_dir_path, new_dir_path)
+                            # Keep the entry map in step with the rename
+                            del parent_entries[old_name_stem]
+                            parent_entries[new_name] = True
+                            self.logger.info("Folder renamed: %s -> %s", old_dir_path, new_dir_path)
+                    return True
+                else:
+                    self.logger.debug("No H1 title found in file %s, skipping rename.", md_path)
+            except Exception as e:
+                self.logger.error("Error renaming note: %s, %s", md_path, str(e))
+            return False
+
+        def rename_dir_batch(parent):
+            """
+            Rename every note recorded in one directory. Where the
+            platform supports it, the directory is opened once, the
+            renames run relative to that descriptor (the kernel skips
+            re-walking the path per rename), and one fsync flushes the
+            whole batch; elsewhere (Windows) the same loop runs on full
+            paths. One task per directory also means no two threads
+            ever share an entry map.
+            """
+            md_paths = notes_by_parent[parent]
+            # The depth waves guarantee no ancestor folder has been
+            # renamed under this path by the pass itself; the error
+            # branch below covers concurrent external modification
+            dir_fd = None
+            try:
+                if _DIR_FD_RENAMES:
+                    dir_fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+                # One listing (through the already-open descriptor where
+                # available) builds the name -> is_dir map used for the
+                # collision checks
+                parent_entries = {}
+                with os.scandir(parent if dir_fd is None else dir_fd) as it:
+                    for entry in it:
+                        parent_entries[entry.name] = entry.is_dir(follow_symlinks=False)
+            except OSError as e:
+                if dir_fd is not None:
+                    os.close(dir_fd)
+                for md_path in md_paths:
+                    self.logger.error("Error renaming note: %s, %s", md_path, str(e))
+                return
+            try:
+                renamed = False
+                for md_path in md_paths:
+                    if rename_one(md_path, parent, parent_entries, dir_fd):
+                        renamed = True
+                if renamed and dir_fd is not None:
+                    # One flush for the whole batch instead of an implicit
+                    # journal flush per rename
+                    os.fsync(dir_fd)
+            finally:
+                if dir_fd is not None:
+                    os.close(dir_fd)
+
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            for depth in sorted(depth_waves, reverse=True):
+                # Consuming the iterator completes the wave (and surfaces
+                # its logging) before the shallower one is submitted
+                list(executor.map(rename_dir_batch, sorted(depth_waves[depth])))
+        self.logger.info("Obsidian note renaming complete.")
+
+# Converter instance reused across calls within one worker process
+_worker_converter = None
+
+def _convert_one(args):
+    """Convert a single Zim file; runs in a worker process"""
+    global _worker_converter
+    zim_path, input_dir, output_dir = args
+
+    # Build the converter lazily so each worker sets it up exactly once.
+    # Logger handles are not picklable, so the worker fetches its own.
+    if _worker_converter is None:
+        logger = logging.getLogger('zim2obsidian')
+        # A forked worker inherits the parent's MemoryHandler buffer,
+        # including every record the parent had not flushed yet; drop
+        # that backlog once per worker, or the per-file flush below
+        # would write the parent's records to the log once per worker
+        for handler in logger.handlers:
+            if isinstance(handler, logging.handlers.MemoryHandler):
+                handler.buffer.clear()
+        _worker_converter = ZimToObsidianConverter(input_dir, output_dir, logger)
+
+    # Collect this file's equation paths and recorded title so the
+    # parent can merge them
+    _worker_converter.processed_equations = set()
+    _worker_converter._note_titles = {}
+    _worker_converter.convert_file(Path(zim_path))
+
+    # Forked workers inherit the buffering file handler but exit via
+    # os._exit, which skips the atexit flush; drain the handlers here so
+    # this file's records are not lost with the worker
+    for handler in _worker_converter.logger.handlers:
+        handler.flush()
+
+    return _worker_converter.processed_equations, _worker_converter._note_titles
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Zim Wiki to Obsidian Converter.")
+    parser.add_argument("input_dir", help="Zim Wiki notebook directory.")
+    parser.add_argument("output_dir", help="Obsidian vault output directory.")
+    parser.add_argument("--log-level", default="info", choices=['debug', 'info', 'warning', 'error', 'critical'], help="Set the logging level.")
+    parser.add_argument("--log-file", help="Path to the log file.")
+    
+    args = parser.parse_args()
+    
+    # Ensure output directory exists
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Set default log file path in the output directory
+    log_file = args.log_file
+    if log_file is None:
+        log_file = str(output_dir / "zim2obsidian.log")
+        # log_file = str("zim2obsidian.log")
+    
+    # Setup logging
+    logger = setup_logging(args.log_level, log_file)
+    logger.info("Log file path: %s", log_file)
+    
+    # Create converter and execute conversion
+    converter = ZimToObsidianConverter(args.input_dir, args.output_dir, logger)
+    converter.convert_notebook()
+
+if __name__ == '__main__':
     main()
\ No newline at end of file